@@ -23,6 +23,7 @@ from typing import Optional
 try:
     from fastapi import FastAPI, Query, HTTPException
     from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.middleware.gzip import GZipMiddleware
     from fastapi.staticfiles import StaticFiles
     from fastapi.responses import FileResponse
 
@@ -30,7 +31,9 @@ try:
 except ImportError:
     HAS_FASTAPI = False
 
-from backend.config import API_HOST, API_PORT, API_CORS_ORIGINS, OUTPUT_JSON, PROJECT_ROOT
+from backend.config import (
+    API_HOST, API_PORT, API_CORS_ORIGINS, API_GZIP_MIN_SIZE, OUTPUT_JSON, PROJECT_ROOT,
+)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -55,12 +58,44 @@ def _load_data():
         data = json.load(f)
 
     _meta = data.get("meta", {})
-    _charities = data.get("charities", [])
+    _charities = _rows_to_records(data.get("charities", []), data.get("schema"))
+    _charities = _expand_lookups(_charities, data.get("lookup", {}))
     _by_number = {c["n"]: c for c in _charities}
 
     print(f"✓ Loaded {len(_charities)} charities from {OUTPUT_JSON}")
 
 
+def _rows_to_records(rows: list, schema: Optional[list]) -> list[dict]:
+    """
+    Rebuild keyed records from the pipeline's positional rows.
+
+    ``schema`` names the row columns; rows without geocoding are shorter
+    and simply lack the trailing geo keys. Older files with keyed
+    records (no schema) pass through unchanged.
+    """
+    if not schema:
+        return rows
+    return [dict(zip(schema, row)) for row in rows]
+
+
+def _expand_lookups(charities: list[dict], lookup: dict) -> list[dict]:
+    """
+    Restore interned labels (categories, districts, ...) in place.
+
+    The pipeline stores repeated strings once in ``lookup`` and each
+    record holds indices into those tables; expand them so the
+    endpoints can keep working with plain labels.
+    """
+    for key, table in lookup.items():
+        for c in charities:
+            v = c.get(key)
+            if isinstance(v, list):
+                c[key] = [table[i] for i in v]
+            elif v is not None:
+                c[key] = table[v]
+    return charities
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # HAVERSINE DISTANCE
 # ═══════════════════════════════════════════════════════════════════════════
@@ -103,6 +138,8 @@ def create_app() -> "FastAPI":
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Compress JSON responses and the static data files on the fly
+    app.add_middleware(GZipMiddleware, minimum_size=API_GZIP_MIN_SIZE)
 
     # Load data on startup
     @app.on_event("startup")
@@ -7,6 +7,7 @@ without touching any other module.
 """
 
 import os
+import re
 
 # ─── Paths ──────────────────────────────────────────────────────────────────
 
@@ -17,6 +18,12 @@ OUTPUT_JS = os.path.join(OUTPUT_DIR, "charities_data.js")
 OUTPUT_JSON = os.path.join(OUTPUT_DIR, "charities_data.json")
 
 
+# ─── Pipeline ───────────────────────────────────────────────────────────────
+
+LOAD_WORKERS = 4           # processes used to parse the supplementary datasets
+PROCESSED_CACHE_PATH = os.path.join(DATA_DIR, "processed_{region}_{sig}.pkl.gz")  # scored charities, one per region
+
+
 # ─── Charity Commission Data Sources ────────────────────────────────────────
 
 CC_BLOB_BASE = "https://ccewuksprdoneregsadata1.blob.core.windows.net/data/txt"
@@ -49,8 +56,12 @@ DATASETS = {
 
 POSTCODES_IO_BULK = "https://api.postcodes.io/postcodes"
 POSTCODES_IO_SINGLE = "https://api.postcodes.io/postcodes/{postcode}"
+POSTCODES_IO_OUTCODE = "https://api.postcodes.io/outcodes/{outcode}"
 GEOCODE_BATCH_SIZE = 100   # postcodes.io accepts up to 100 per request
 GEOCODE_TIMEOUT = 30       # seconds
+GEOCODE_WORKERS = 8        # concurrent requests in flight
+GEOCODE_MAX_RETRIES = 3    # retries on HTTP 429, with exponential backoff
+GEOCODE_CACHE_PATH = os.path.join(DATA_DIR, "geocode.sqlite")  # persists across runs
 
 
 # ─── API Server ─────────────────────────────────────────────────────────────
@@ -58,6 +69,7 @@ GEOCODE_TIMEOUT = 30       # seconds
 API_HOST = "0.0.0.0"
 API_PORT = 8000
 API_CORS_ORIGINS = ["*"]
+API_GZIP_MIN_SIZE = 1000   # bytes; smaller responses are sent uncompressed
 
 
 # ─── Classification Codes ───────────────────────────────────────────────────
@@ -207,13 +219,8 @@ ANOMALY_RULES = {
 
 LONDON_OUTWARD_PREFIXES = ["E", "EC", "N", "NW", "SE", "SW", "W", "WC"]
 
-def build_london_outward_set():
-    """Build set of valid London outward codes for filtering."""
-    codes = set()
-    for prefix in LONDON_OUTWARD_PREFIXES:
-        for i in range(30):
-            codes.add(f"{prefix}{i}")
-        codes.add(prefix)
-    return codes
-
-LONDON_OUTWARD = build_london_outward_set()
\ No newline at end of file
+# A London area prefix followed directly by its district digit, so
+# sub-districts like "EC1A" / "SW1A" match and "EN1" / "NN1" don't.
+LONDON_POSTCODE_RE = re.compile(
+    r"^(?:%s)\d" % "|".join(sorted(LONDON_OUTWARD_PREFIXES, key=len, reverse=True))
+)
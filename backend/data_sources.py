@@ -11,14 +11,20 @@ Licence:     Open Government Licence v3.0
 import os
 import csv
 import sys
+import shutil
+import logging
 import zipfile
+from operator import itemgetter
 from urllib.request import urlretrieve
 from urllib.error import URLError
-from typing import Optional, List, Dict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Iterator, Tuple, Container, Sequence
 csv.field_size_limit(sys.maxsize)
-from backend.config import DATASETS, DATA_DIR
+from backend.config import DATASETS, DATA_DIR, LOAD_WORKERS
 from backend.models import Charity, AnnualReturn
 
+logger = logging.getLogger(__name__)
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # DOWNLOADING
@@ -28,18 +34,23 @@ def download_all(force: bool = False) -> Dict[str, str]:
     """
     Download all configured datasets from the Charity Commission.
 
+    Archives are fetched concurrently (one thread each — the work is
+    network-bound), and each is extracted as soon as its own download
+    completes.
+
     Returns:
         dict mapping dataset name → local file path of extracted text file.
     """
     os.makedirs(DATA_DIR, exist_ok=True)
-    paths: Dict[str, str] = {}
 
-    for name, info in DATASETS.items():
-        txt_path = _download_and_extract(name, info["url"], force=force)
-        if txt_path:
-            paths[name] = txt_path
+    with ThreadPoolExecutor(max_workers=len(DATASETS)) as ex:
+        futures = {
+            name: ex.submit(_download_and_extract, name, info["url"], force=force)
+            for name, info in DATASETS.items()
+        }
+        results = {name: f.result() for name, f in futures.items()}
 
-    return paths
+    return {name: path for name, path in results.items() if path}
 
 
 def _download_and_extract(name: str, url: str, force: bool = False) -> Optional[str]:
@@ -49,22 +60,22 @@ def _download_and_extract(name: str, url: str, force: bool = False) -> Optional[
 
     # Use cached extract if available
     if os.path.exists(txt_path) and not force:
-        print(f"  ✓ {name} — cached")
+        logger.info("  ✓ %s — cached", name)
         return txt_path
 
     # Download
     if not os.path.exists(zip_path) or force:
-        print(f"  ↓ Downloading {name}...")
+        logger.info("  ↓ Downloading %s...", name)
         try:
             urlretrieve(url, zip_path)
             size_mb = os.path.getsize(zip_path) / 1e6
-            print(f"    {size_mb:.1f} MB downloaded")
+            logger.info("    %s: %.1f MB downloaded", name, size_mb)
         except URLError as e:
-            print(f"    ✗ Failed: {e}")
+            logger.warning("    ✗ %s failed: %s", name, e)
             return None
 
     # Extract
-    print(f"  ⤳ Extracting {name}...")
+    logger.info("  ⤳ Extracting %s...", name)
     try:
         with zipfile.ZipFile(zip_path, "r") as z:
             for member in z.namelist():
@@ -75,42 +86,79 @@ def _download_and_extract(name: str, url: str, force: bool = False) -> Optional[
             _extract_member(z, z.namelist()[0], txt_path)
             return txt_path
     except Exception as e:
-        print(f"    ✗ Extraction failed: {e}")
+        logger.warning("    ✗ %s extraction failed: %s", name, e)
         return None
 
 
 def _extract_member(zf: zipfile.ZipFile, member: str, dest: str):
-    """Extract a single member from a ZIP archive."""
+    """Extract a single member from a ZIP archive, streaming 1 MB blocks."""
     with zf.open(member) as src, open(dest, "wb") as dst:
-        dst.write(src.read())
+        shutil.copyfileobj(src, dst, 1024 * 1024)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # PARSING
 # ═══════════════════════════════════════════════════════════════════════════
 
-def parse_tsv(filepath: str, max_rows: Optional[int] = None) -> List[Dict]:
+def iter_tsv(
+    filepath: str,
+    columns: Optional[Sequence[str]] = None,
+    max_rows: Optional[int] = None,
+) -> Iterator:
     """
-    Parse a tab-delimited file into a list of row dictionaries.
+    Stream a tab-delimited file one row at a time.
     Handles encoding issues gracefully.
+
+    With ``columns``, each row is a tuple of just those fields, in that
+    order, picked positionally by a C ``itemgetter`` built once from the
+    header — no per-row dict. Columns absent from the header, or cut off
+    by a short row, read as "". Without ``columns``, rows are dicts
+    keyed by header name.
+
+    Only the current row is held in memory, so callers can fold the
+    full register without materialising it.
     """
-    rows: List[Dict] = []
     try:
         with open(filepath, "r", encoding="utf-8-sig", errors="replace") as f:
-            reader = csv.DictReader(f, delimiter="\t")
-            for i, row in enumerate(reader):
-                if max_rows is not None and i >= max_rows:
+            reader = csv.reader(f, delimiter="\t")
+            header = next(reader, None)
+            if header is None:
+                return
+
+            if columns is None:
+                pick = lambda row: dict(zip(header, row))
+                width = 0
+            else:
+                pos = {name: i for i, name in enumerate(header)}
+                idx = [pos.get(name, len(header)) for name in columns]
+                width = max(idx) + 1
+                pick = itemgetter(*idx) if len(idx) > 1 else (lambda row: (row[idx[0]],))
+
+            count = 0
+            for row in reader:
+                if not row:
+                    continue
+                if max_rows is not None and count >= max_rows:
                     break
-                rows.append(row)
+                count += 1
+                if len(row) < width:
+                    row += [""] * (width - len(row))
+                yield pick(row)
     except FileNotFoundError:
-        print(f"  ✗ File not found: {filepath}")
-    return rows
+        logger.warning("  ✗ File not found: %s", filepath)
 
 
 def safe_float(val, default: float = 0.0) -> float:
     """Safely convert a string value to float."""
     if val is None:
         return default
+    # Fast path: most cells are already plain numbers (float() also
+    # tolerates surrounding whitespace). Only fall back to cleaning
+    # for "£1,234"-style values and placeholders.
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        pass
     try:
         cleaned = str(val).strip().replace(",", "").replace("£", "")
         if cleaned in ("", "-", "N/A", "None"):
@@ -129,6 +177,23 @@ def safe_int(val, default: int = 0) -> int:
 # LOADING INTO MODELS
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Register columns in the order _charity_from_row unpacks them
+_CHARITY_COLUMNS = (
+    "charity_registration_status",
+    "registered_charity_number",
+    "charity_name",
+    "charity_contact_postcode",
+    "latest_income",
+    "latest_expenditure",
+    "date_of_registration",
+    "date_of_removal",
+    "charity_activities",
+    "charity_company_registration_number",
+    "charity_reporting_status",
+)
+_CHARITY_POSTCODE = _CHARITY_COLUMNS.index("charity_contact_postcode")
+
+
 def load_charities(region: Optional[str] = None) -> Dict[str, Charity]:
     """
     Load the main charity register and return indexed by charity number.
@@ -136,72 +201,219 @@ def load_charities(region: Optional[str] = None) -> Dict[str, Charity]:
     Args:
         region: Optional filter — currently supports "london".
     """
-    from backend.config import LONDON_OUTWARD
+    from backend.config import LONDON_POSTCODE_RE
 
     filepath = os.path.join(DATA_DIR, "charity.txt")
-    raw = parse_tsv(filepath)
-    print(f"  Loaded {len(raw)} raw charity records")
-
     charities: Dict[str, Charity] = {}
+    n_rows = 0
 
-    for row in raw:
-        status = (row.get("charity_registration_status") or "").strip().lower()
-        if status != "registered":
-            continue
+    rows = iter_tsv(filepath, _CHARITY_COLUMNS)
+
+    # Pick the loop once so the default path carries no region check
+    if region == "london":
+        in_london = LONDON_POSTCODE_RE.match
+        for row in rows:
+            n_rows += 1
+            if not in_london(row[_CHARITY_POSTCODE].strip().upper()):
+                continue
+            c = _charity_from_row(row)
+            if c is not None:
+                charities[c.charity_number] = c
+    else:
+        for row in rows:
+            n_rows += 1
+            c = _charity_from_row(row)
+            if c is not None:
+                charities[c.charity_number] = c
+
+    logger.info("  Loaded %s raw charity records", n_rows)
+    logger.info("  Active registered charities: %s", len(charities))
+    return charities
 
-        num = (row.get("registered_charity_number") or "").strip()
-        if not num:
-            continue
 
-        name = (row.get("charity_name") or "").strip()
-        if not name:
+def _charity_from_row(row: Tuple[str, ...]) -> Optional[Charity]:
+    """Build a Charity from a register row, or None if not active/usable."""
+    (status, num, name, postcode, income, spending,
+     registered, removed, activities, company, reporting) = row
+
+    if status.strip().lower() != "registered":
+        return None
+
+    num = num.strip()
+    if not num:
+        return None
+
+    name = name.strip()
+    if not name:
+        return None
+
+    return Charity(
+        charity_number=num,
+        name=name,
+        postcode=postcode.strip().upper(),
+        income=safe_float(income),
+        spending=safe_float(spending),
+        date_registered=registered.strip(),
+        date_removed=removed.strip(),
+        activities=activities.strip()[:300],
+        company_number=company.strip(),
+        reporting_status=reporting.strip(),
+    )
+
+
+def load_supplementary(charities: Dict[str, Charity], workers: int = LOAD_WORKERS) -> None:
+    """
+    Load all supplementary datasets and attach them to charity objects.
+
+    Each dataset is parsed in its own worker process, which sends back
+    only the projected fields for known charities. Results are folded
+    into ``charities`` on the calling process as each parse finishes;
+    the datasets update disjoint fields, so fold order does not matter.
+    With ``workers <= 1`` the datasets are loaded serially in-process.
+    Only one dataset's parsed records are alive at a time per worker,
+    and the raw files are streamed, never held whole.
+    """
+    if workers <= 1:
+        for name, read, fold in _SUPPLEMENTARY:
+            fold(charities, *read(os.path.join(DATA_DIR, f"{name}.txt"), charities))
+        return
+
+    known = frozenset(charities)
+    with ProcessPoolExecutor(max_workers=min(workers, len(_SUPPLEMENTARY))) as ex:
+        futures = {
+            ex.submit(read, os.path.join(DATA_DIR, f"{name}.txt"), known): fold
+            for name, read, fold in _SUPPLEMENTARY
+        }
+        # Pop each future as it is folded so its parsed records can be
+        # freed straight away rather than when the pool shuts down.
+        for future in as_completed(futures):
+            fold = futures.pop(future)
+            fold(charities, *future.result())
+
+
+# ── Readers (picklable; run in worker processes) ───────────────────────────
+# Each returns (rows_read, records) where records hold only the fields
+# needed for charities in ``known``.
+
+def _read_classifications(filepath: str, known: Container[str]) -> Tuple[int, list]:
+    from backend.config import CLASSIFICATION_WHAT, CLASSIFICATION_WHO, CLASSIFICATION_HOW
+
+    lookup = {"What": CLASSIFICATION_WHAT, "Who": CLASSIFICATION_WHO, "How": CLASSIFICATION_HOW}
+    records = []
+    n_rows = 0
+
+    columns = (
+        "registered_charity_number",
+        "classification_type",
+        "classification_code",
+        "classification_description",
+    )
+
+    for num, cls_type, cls_code, cls_desc in iter_tsv(filepath, columns):
+        n_rows += 1
+        num = num.strip()
+        if num not in known:
             continue
 
-        postcode = (row.get("charity_contact_postcode") or "").strip().upper()
+        cls_type = cls_type.strip()
+        cls_code = cls_code.strip()
+        cls_desc = cls_desc.strip()
+        label = cls_desc or lookup.get(cls_type, {}).get(cls_code, "Unknown")
+        records.append((num, cls_type, label))
 
-        # Location filter
-        if region == "london":
-            outward = postcode.split()[0] if " " in postcode else postcode[: len(postcode) - 3].strip()
-            if outward not in LONDON_OUTWARD:
-                continue
+    return n_rows, records
 
-        charities[num] = Charity(
-            charity_number=num,
-            name=name,
-            postcode=postcode,
-            income=safe_float(row.get("latest_income")),
-            spending=safe_float(row.get("latest_expenditure")),
-            date_registered=(row.get("date_of_registration") or "").strip(),
-            date_removed=(row.get("date_of_removal") or "").strip(),
-            activities=(row.get("charity_activities") or "").strip()[:300],
-            company_number=(row.get("charity_company_registration_number") or "").strip(),
-            reporting_status=(row.get("charity_reporting_status") or "").strip(),
-        )
 
-    print(f"  Active registered charities: {len(charities)}")
-    return charities
+def _read_annual_returns(filepath: str, known: Container[str]) -> Tuple[int, list]:
+    records = []
+    n_rows = 0
 
+    columns = (
+        "registered_charity_number",
+        "fin_period_end_date",
+        "total_gross_income",
+        "total_gross_expenditure",
+        "ar_cycle_reference",
+    )
 
-def load_classifications(charities: Dict[str, Charity]) -> None:
-    """Load classification data and attach to charity objects (mutates in-place)."""
-    from backend.config import CLASSIFICATION_WHAT, CLASSIFICATION_WHO, CLASSIFICATION_HOW
+    for num, fin_end, income, spending, ar_cycle in iter_tsv(filepath, columns):
+        n_rows += 1
+        num = num.strip()
+        if num not in known:
+            continue
 
-    filepath = os.path.join(DATA_DIR, "charity_classification.txt")
-    rows = parse_tsv(filepath)
-    print(f"  Loaded {len(rows)} classification records")
+        records.append((num, fin_end.strip(), safe_float(income), safe_float(spending), ar_cycle.strip()))
+
+    # One stable sort of the whole dataset, newest first, so each
+    # charity's annual_returns list is folded in already ordered.
+    records.sort(key=itemgetter(1), reverse=True)
+    return n_rows, records
+
+
+def _read_parta_returns(filepath: str, known: Container[str]) -> Tuple[int, list]:
+    # Track latest raw row per charity; numbers are only converted for
+    # the winning row, not for every superseded return.
+    latest: Dict[str, tuple] = {}
+    n_rows = 0
+
+    columns = (
+        "registered_charity_number",
+        "fin_period_end_date",
+        "reserves",
+        "count_employees",
+        "count_volunteers",
+        "total_gross_income",
+        "total_gross_expenditure",
+    )
+
+    for row in iter_tsv(filepath, columns):
+        n_rows += 1
+        num = row[0].strip()
+        if num not in known:
+            continue
 
-    lookup = {"What": CLASSIFICATION_WHAT, "Who": CLASSIFICATION_WHO, "How": CLASSIFICATION_HOW}
+        fin_end = row[1].strip()
+        prev = latest.get(num)
+        if prev is None or fin_end > prev[0]:
+            latest[num] = (fin_end, row)
+
+    records = [
+        (
+            num,
+            safe_float(reserves),
+            safe_int(employees),
+            safe_int(volunteers),
+            safe_float(income),
+            safe_float(spending),
+        )
+        for num, (_, (_, _, reserves, employees, volunteers, income, spending)) in latest.items()
+    ]
+    return n_rows, records
+
+
+def _read_areas_of_operation(filepath: str, known: Container[str]) -> Tuple[int, list]:
+    records = []
+    n_rows = 0
 
-    for row in rows:
-        num = (row.get("registered_charity_number") or "").strip()
-        if num not in charities:
+    columns = ("registered_charity_number", "geographic_area_description")
+
+    for num, area in iter_tsv(filepath, columns):
+        n_rows += 1
+        num = num.strip()
+        if num not in known:
             continue
+        area = area.strip()
+        if area:
+            records.append((num, area))
 
-        cls_type = (row.get("classification_type") or "").strip()
-        cls_code = (row.get("classification_code") or "").strip()
-        cls_desc = (row.get("classification_description") or "").strip()
-        label = cls_desc or lookup.get(cls_type, {}).get(cls_code, "Unknown")
+    return n_rows, records
 
+
+# ── Folds (run in the calling process; mutate charities) ───────────────────
+
+def _fold_classifications(charities: Dict[str, Charity], n_rows: int, records: list) -> None:
+    logger.info("  Loaded %s classification records", n_rows)
+    for num, cls_type, label in records:
         c = charities[num]
         if cls_type == "What":
             c.categories.append(label)
@@ -211,79 +423,38 @@ def load_classifications(charities: Dict[str, Charity]) -> None:
             c.methods.append(label)
 
 
-def load_annual_returns(charities: Dict[str, Charity]) -> None:
-    """Load annual return history and attach to charity objects."""
-    filepath = os.path.join(DATA_DIR, "charity_annual_return_history.txt")
-    rows = parse_tsv(filepath)
-    print(f"  Loaded {len(rows)} annual return records")
-
-    for row in rows:
-        num = (row.get("registered_charity_number") or "").strip()
-        if num not in charities:
-            continue
-
+def _fold_annual_returns(charities: Dict[str, Charity], n_rows: int, records: list) -> None:
+    logger.info("  Loaded %s annual return records", n_rows)
+    for num, fin_end, income, spending, ar_cycle in records:
         charities[num].annual_returns.append(
-            AnnualReturn(
-                fin_period_end=(row.get("fin_period_end_date") or "").strip(),
-                income=safe_float(row.get("total_gross_income")),
-                spending=safe_float(row.get("total_gross_expenditure")),
-                ar_cycle=(row.get("ar_cycle_reference") or "").strip(),
-            )
+            AnnualReturn(fin_period_end=fin_end, income=income, spending=spending, ar_cycle=ar_cycle)
         )
 
 
-def load_parta_returns(charities: Dict[str, Charity]) -> None:
-    """
-    Load Part A annual returns (reserves, employees, volunteers).
-    Keeps only the latest return per charity.
-    """
-    filepath = os.path.join(DATA_DIR, "charity_annual_return_parta.txt")
-    rows = parse_tsv(filepath)
-    print(f"  Loaded {len(rows)} Part A records")
-
-    # Track latest per charity
-    latest: Dict[str, Dict] = {}
-
-    for row in rows:
-        num = (row.get("registered_charity_number") or "").strip()
-        if num not in charities:
-            continue
-
-        fin_end = (row.get("fin_period_end_date") or "").strip()
-        if num not in latest or fin_end > latest[num]["fin_end"]:
-            latest[num] = {
-                "fin_end": fin_end,
-                "income": safe_float(row.get("total_gross_income")),
-                "spending": safe_float(row.get("total_gross_expenditure")),
-                "reserves": safe_float(row.get("reserves")),
-                "employees": safe_int(row.get("count_employees")),
-                "volunteers": safe_int(row.get("count_volunteers")),
-            }
-
-    # Merge into charity objects
-    for num, pa in latest.items():
+def _fold_parta_returns(charities: Dict[str, Charity], n_rows: int, records: list) -> None:
+    logger.info("  Loaded %s Part A records", n_rows)
+    for num, reserves, employees, volunteers, income, spending in records:
         c = charities[num]
-        c.reserves = pa["reserves"]
-        c.employees = pa["employees"]
-        c.volunteers = pa["volunteers"]
-        if pa["income"] > 0:
-            c.income = pa["income"]
-        if pa["spending"] > 0:
-            c.spending = pa["spending"]
-
-
-def load_areas_of_operation(charities: Dict[str, Charity]) -> None:
-    """Load geographic areas of operation and attach to charity objects."""
-    filepath = os.path.join(DATA_DIR, "charity_area_of_operation.txt")
-    rows = parse_tsv(filepath)
-    print(f"  Loaded {len(rows)} area records")
-
-    for row in rows:
-        num = (row.get("registered_charity_number") or "").strip()
-        if num not in charities:
-            continue
-        area = (row.get("geographic_area_description") or "").strip()
-        if area:
-            charities[num].area_of_operation.append(area)
+        c.reserves = reserves
+        c.employees = employees
+        c.volunteers = volunteers
+        if income > 0:
+            c.income = income
+        if spending > 0:
+            c.spending = spending
+
+
+def _fold_areas_of_operation(charities: Dict[str, Charity], n_rows: int, records: list) -> None:
+    logger.info("  Loaded %s area records", n_rows)
+    for num, area in records:
+        charities[num].area_of_operation.append(area)
+
+
+_SUPPLEMENTARY = (
+    ("charity_classification", _read_classifications, _fold_classifications),
+    ("charity_annual_return_history", _read_annual_returns, _fold_annual_returns),
+    ("charity_annual_return_parta", _read_parta_returns, _fold_parta_returns),
+    ("charity_area_of_operation", _read_areas_of_operation, _fold_areas_of_operation),
+)
 
 # Back end test
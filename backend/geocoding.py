@@ -5,14 +5,33 @@ Batch geocoding of UK postcodes using postcodes.io
 (free, no API key required, CORS-enabled).
 """
 
+import os
 import json
-from urllib.request import Request, urlopen
-from urllib.error import URLError
-from typing import List, Dict, Optional
+import time
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.client import HTTPConnection, HTTPSConnection, CannotSendRequest, RemoteDisconnected
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen, getproxies, proxy_bypass
+from urllib.error import URLError, HTTPError
+from typing import List, Dict, Optional, Tuple
 
-from backend.config import POSTCODES_IO_BULK, POSTCODES_IO_SINGLE, GEOCODE_BATCH_SIZE, GEOCODE_TIMEOUT
+from backend.config import (
+    POSTCODES_IO_BULK,
+    POSTCODES_IO_SINGLE,
+    POSTCODES_IO_OUTCODE,
+    GEOCODE_BATCH_SIZE,
+    GEOCODE_TIMEOUT,
+    GEOCODE_WORKERS,
+    GEOCODE_MAX_RETRIES,
+    GEOCODE_CACHE_PATH,
+)
 from backend.models import Charity, GeoLocation
 
+logger = logging.getLogger(__name__)
+
 
 def geocode_charities(charities: List[Charity]) -> List[Charity]:
     """
@@ -20,26 +39,49 @@ def geocode_charities(charities: List[Charity]) -> List[Charity]:
 
     Adds a GeoLocation to each charity that can be resolved.
     Returns only the charities that were successfully geocoded.
+
+    Exact hits are kept in an on-disk cache, so repeat runs only send
+    postcodes that have not been resolved before. Postcodes the bulk
+    endpoint reports as unknown (e.g. terminated ones) fall back to the
+    centroid of their outward code; those centroids are not cached, so
+    the exact lookup is tried again next run. Postcodes from batches
+    that failed outright are left unresolved and uncached.
     """
-    # Collect unique postcodes
-    postcodes = list({c.postcode for c in charities if c.postcode})
-    print(f"  Geocoding {len(postcodes)} unique postcodes...")
+    # Collect unique postcodes; spacing variants of one postcode share a key
+    keys = [_normalise_postcode(c.postcode) for c in charities]
+    postcodes = list({key for key in keys if key})
+    logger.info("  Geocoding %s unique postcodes...", len(postcodes))
+
+    # Cached results first; only unknown postcodes go to the network
+    pc_to_geo = _cache_load(postcodes)
+    missing = [pc for pc in postcodes if pc not in pc_to_geo]
+    logger.info("    %s from cache, %s to look up", len(pc_to_geo), len(missing))
+
+    # Bulk lookup; only exact hits are persisted
+    fetched, not_found = _bulk_lookup(missing)
+    _cache_store(fetched)
+    pc_to_geo.update(fetched)
 
-    # Bulk lookup
-    pc_to_geo = _bulk_lookup(postcodes)
+    failed = len(missing) - len(fetched) - len(not_found)
+    if failed:
+        logger.warning("    ✗ %s postcodes in failed batches; they will be retried next run", failed)
+
+    # Approximate location for postcodes the API does not know
+    if not_found:
+        pc_to_geo.update(_outward_fallback(not_found))
 
     # Attach results
     geocoded = 0
     results: List[Charity] = []
 
-    for c in charities:
-        geo = pc_to_geo.get(c.postcode)
+    for c, key in zip(charities, keys):
+        geo = pc_to_geo.get(key)
         if geo:
             c.geo = geo
             geocoded += 1
             results.append(c)
 
-    print(f"  ✓ Geocoded {geocoded}/{len(charities)} charities")
+    logger.info("  ✓ Geocoded %s/%s charities", geocoded, len(charities))
     return results
 
 
@@ -51,8 +93,7 @@ def geocode_single(postcode: str) -> Optional[GeoLocation]:
     """
     url = POSTCODES_IO_SINGLE.format(postcode=postcode.replace(" ", "%20"))
     try:
-        with urlopen(url, timeout=GEOCODE_TIMEOUT) as resp:
-            data = json.loads(resp.read().decode())
+        data = _request_json("GET", url)
         if data.get("status") == 200 and data.get("result"):
             r = data["result"]
             return GeoLocation(
@@ -68,40 +109,45 @@ def geocode_single(postcode: str) -> Optional[GeoLocation]:
 
 # ── Internal ────────────────────────────────────────────────────────────────
 
-def _bulk_lookup(postcodes: List[str]) -> Dict[str, GeoLocation]:
+def _bulk_lookup(postcodes: List[str]) -> Tuple[Dict[str, GeoLocation], List[str]]:
     """
     Send postcodes in batches to the postcodes.io bulk endpoint.
+    Up to GEOCODE_WORKERS batches are in flight at once.
 
-    Returns dict mapping postcode string → GeoLocation.
+    Returns (postcode → GeoLocation for hits, postcodes the API answered
+    with no result). Postcodes in batches that failed are in neither.
     """
     results: Dict[str, GeoLocation] = {}
+    not_found: List[str] = []
+    batches = [postcodes[i: i + GEOCODE_BATCH_SIZE] for i in range(0, len(postcodes), GEOCODE_BATCH_SIZE)]
+    done = 0
 
-    for i in range(0, len(postcodes), GEOCODE_BATCH_SIZE):
-        batch = postcodes[i: i + GEOCODE_BATCH_SIZE]
-        batch_results = _send_batch(batch)
-        results.update(batch_results)
+    with ThreadPoolExecutor(max_workers=GEOCODE_WORKERS) as ex:
+        futures = {ex.submit(_send_batch, batch): len(batch) for batch in batches}
+        for future in as_completed(futures):
+            found, missed = future.result()
+            results.update(found)
+            not_found.extend(missed)
 
-        done = min(i + GEOCODE_BATCH_SIZE, len(postcodes))
-        print(f"    {done}/{len(postcodes)} postcodes processed")
+            done += futures[future]
+            logger.info("    %s/%s postcodes processed", done, len(postcodes))
+
+    return results, not_found
 
-    return results
 
+def _send_batch(postcodes: List[str]) -> Tuple[Dict[str, GeoLocation], List[str]]:
+    """
+    Send a single batch of postcodes to postcodes.io.
 
-def _send_batch(postcodes: List[str]) -> Dict[str, GeoLocation]:
-    """Send a single batch of postcodes to postcodes.io."""
+    Returns (hits, queries explicitly resolved to null). A failed
+    request returns nothing for either, so its postcodes stay unknown.
+    """
     results: Dict[str, GeoLocation] = {}
+    not_found: List[str] = []
 
     try:
         payload = json.dumps({"postcodes": postcodes}).encode("utf-8")
-        req = Request(
-            POSTCODES_IO_BULK,
-            data=payload,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-
-        with urlopen(req, timeout=GEOCODE_TIMEOUT) as resp:
-            data = json.loads(resp.read().decode())
+        data = _post_with_backoff(payload)
 
         if data.get("status") == 200:
             for item in data.get("result", []):
@@ -113,8 +159,181 @@ def _send_batch(postcodes: List[str]) -> Dict[str, GeoLocation]:
                         district=r.get("admin_district", ""),
                         ward=r.get("admin_ward", ""),
                     )
+                elif "query" in item:
+                    not_found.append(item["query"])
 
     except (URLError, Exception) as e:
-        print(f"    ✗ Batch geocoding failed: {e}")
+        logger.warning("    ✗ Batch geocoding failed: %s", e)
+
+    return results, not_found
+
+
+def _post_with_backoff(payload: bytes) -> dict:
+    """POST to the bulk endpoint, backing off exponentially on HTTP 429."""
+    for attempt in range(GEOCODE_MAX_RETRIES + 1):
+        try:
+            return _request_json("POST", POSTCODES_IO_BULK, payload)
+        except HTTPError as e:
+            if e.code != 429 or attempt == GEOCODE_MAX_RETRIES:
+                raise
+            time.sleep(2 ** attempt)
+
+
+_local = threading.local()
+
+# Errors meaning a reused keep-alive connection was closed by the server
+_STALE_CONNECTION_ERRORS = (RemoteDisconnected, ConnectionResetError, BrokenPipeError, CannotSendRequest)
+
+
+def _request_json(method: str, url: str, body: Optional[bytes] = None) -> dict:
+    """
+    Send a request and decode its JSON reply.
+
+    Each thread keeps one keep-alive connection per host, so successive
+    batches skip the TCP + TLS handshake. A connection the server has
+    closed is reopened once; timeouts propagate without a retry. When a proxy is configured for the scheme
+    the request goes through urlopen instead, which honours it. Error
+    statuses raise HTTPError either way.
+    """
+    parts = urlsplit(url)
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+
+    # Behind an HTTP(S)_PROXY, let urlopen's ProxyHandler route the request
+    if parts.scheme in getproxies() and not proxy_bypass(parts.hostname or ""):
+        req = Request(url, data=body, headers=headers, method=method)
+        with urlopen(req, timeout=GEOCODE_TIMEOUT) as resp:
+            return json.loads(resp.read().decode())
+
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    conns = _local.__dict__.setdefault("conns", {})
+
+    for attempt in range(2):
+        conn = conns.get(parts.netloc)
+        if conn is None:
+            cls = HTTPSConnection if parts.scheme == "https" else HTTPConnection
+            conn = conns[parts.netloc] = cls(parts.netloc, timeout=GEOCODE_TIMEOUT)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            raw = resp.read()
+            break
+        except _STALE_CONNECTION_ERRORS:
+            # The kept-alive socket died under us; reconnect once
+            conn.close()
+            del conns[parts.netloc]
+            if attempt:
+                raise
+        except Exception:
+            # Timeouts and other failures are not retried here
+            conn.close()
+            del conns[parts.netloc]
+            raise
+
+    if resp.status >= 400:
+        raise HTTPError(url, resp.status, resp.reason, resp.headers, None)
+    return json.loads(raw.decode())
+
 
+def _outward_fallback(postcodes: List[str]) -> Dict[str, GeoLocation]:
+    """
+    Resolve postcodes to the centroid of their outward code.
+
+    One request is sent per distinct outward code, and the result is
+    shared by every postcode in that district.
+    """
+    by_outward: Dict[str, List[str]] = {}
+    for pc in postcodes:
+        outward = _outward_code(pc)
+        if outward:
+            by_outward.setdefault(outward, []).append(pc)
+
+    logger.info("    Falling back to %s outward codes for %s unresolved postcodes", len(by_outward), len(postcodes))
+
+    results: Dict[str, GeoLocation] = {}
+    with ThreadPoolExecutor(max_workers=GEOCODE_WORKERS) as ex:
+        for outward, geo in zip(by_outward, ex.map(_lookup_outcode, by_outward)):
+            if geo:
+                for pc in by_outward[outward]:
+                    results[pc] = geo
+    return results
+
+
+def _normalise_postcode(postcode: str) -> str:
+    """Canonical postcode form ("sw1a1aa " → "SW1A 1AA"), or "" if blank."""
+    pc = "".join(postcode.split()).upper()
+    return f"{pc[:-3]} {pc[-3:]}" if len(pc) > 3 else pc
+
+
+def _outward_code(postcode: str) -> str:
+    """Outward half of a postcode ("SW1A 1AA" → "SW1A")."""
+    pc = postcode.strip().upper()
+    return pc.split()[0] if " " in pc else pc[:-3]
+
+
+def _lookup_outcode(outcode: str) -> Optional[GeoLocation]:
+    """Look up the centroid of a single outward code."""
+    url = POSTCODES_IO_OUTCODE.format(outcode=outcode)
+    try:
+        data = _request_json("GET", url)
+        r = data.get("result")
+        if data.get("status") == 200 and r and r.get("latitude") is not None:
+            districts = r.get("admin_district") or [""]
+            return GeoLocation(lat=r["latitude"], lng=r["longitude"], district=districts[0])
+    except Exception:
+        pass
+    return None
+
+
+_CACHE_QUERY_CHUNK = 500
+
+
+def _open_cache() -> sqlite3.Connection:
+    """Open (creating if needed) the persistent postcode cache."""
+    os.makedirs(os.path.dirname(GEOCODE_CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(GEOCODE_CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS postcodes ("
+        "postcode TEXT PRIMARY KEY, lat REAL, lng REAL, district TEXT, ward TEXT)"
+    )
+    return conn
+
+
+def _cache_load(postcodes: List[str]) -> Dict[str, GeoLocation]:
+    """Return cached GeoLocations for any of the given postcodes."""
+    results: Dict[str, GeoLocation] = {}
+    try:
+        conn = _open_cache()
+        try:
+            # Primary-key lookups in chunks, kept under SQLite's bound-parameter limit
+            for i in range(0, len(postcodes), _CACHE_QUERY_CHUNK):
+                chunk = postcodes[i: i + _CACHE_QUERY_CHUNK]
+                rows = conn.execute(
+                    "SELECT postcode, lat, lng, district, ward FROM postcodes "
+                    f"WHERE postcode IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for pc, lat, lng, district, ward in rows:
+                    results[pc] = GeoLocation(lat=lat, lng=lng, district=district, ward=ward)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("    ✗ Geocode cache unavailable: %s", e)
     return results
+
+
+def _cache_store(pc_to_geo: Dict[str, GeoLocation]) -> None:
+    """Persist newly resolved postcodes to the cache."""
+    if not pc_to_geo:
+        return
+    try:
+        conn = _open_cache()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO postcodes VALUES (?, ?, ?, ?, ?)",
+                    [(pc, g.lat, g.lng, g.district, g.ward) for pc, g in pc_to_geo.items()],
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("    ✗ Could not update geocode cache: %s", e)
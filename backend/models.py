@@ -10,7 +10,17 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 
-@dataclass
+# Field order of the positional rows produced by Charity.to_compact().
+# Written alongside the data so readers can rebuild keyed records; the
+# trailing geo fields are only present on geocoded charities.
+COMPACT_FIELDS = (
+    "n", "nm", "pc", "inc", "exp", "res", "emp", "vol", "cat", "ben",
+    "act", "reg", "ns", "nf", "rm", "it", "sr", "an", "ar",
+    "lat", "lng", "dist", "ward",
+)
+
+
+@dataclass(slots=True)
 class AnnualReturn:
     """A single year's financial return from the Charity Commission."""
     fin_period_end: str          # ISO date string
@@ -27,7 +37,7 @@ class AnnualReturn:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Anomaly:
     """A detected anomaly flag on a charity's financials."""
     type: str                    # e.g. "income_drop", "critical_reserves"
@@ -38,7 +48,7 @@ class Anomaly:
         return {"type": self.type, "severity": self.severity, "detail": self.detail}
 
 
-@dataclass
+@dataclass(slots=True)
 class NeedScore:
     """Composite need score with its constituent factors."""
     total: int = 0
@@ -48,7 +58,7 @@ class NeedScore:
         return {"total": self.total, "factors": self.factors}
 
 
-@dataclass
+@dataclass(slots=True)
 class GeoLocation:
     """Geocoded postcode result."""
     lat: float
@@ -57,7 +67,7 @@ class GeoLocation:
     ward: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Charity:
     """
     Full charity record combining register data, financials,
@@ -86,7 +96,7 @@ class Charity:
     methods: list[str] = field(default_factory=list)          # How
 
     # ── History ──
-    annual_returns: list[AnnualReturn] = field(default_factory=list)
+    annual_returns: list[AnnualReturn] = field(default_factory=list)   # newest first
     area_of_operation: list[str] = field(default_factory=list)
 
     # ── Computed ──
@@ -99,40 +109,42 @@ class Charity:
     # ── Geo ──
     geo: Optional[GeoLocation] = None
 
-    def to_compact(self) -> dict:
+    def to_compact(self) -> list:
         """
-        Serialise to a compact dictionary for the frontend.
-        Keys are abbreviated to minimise JSON payload.
+        Serialise to a compact positional row for the frontend.
+        Values follow COMPACT_FIELDS, so keys are not repeated per record.
         """
-        d = {
-            "n":   self.charity_number,
-            "nm":  self.name,
-            "pc":  self.postcode,
-            "inc": round(self.income),
-            "exp": round(self.spending),
-            "res": round(self.reserves),
-            "emp": self.employees,
-            "vol": self.volunteers,
-            "cat": self.categories[:3],
-            "ben": self.beneficiaries[:2],
-            "act": self.activities[:200],
-            "reg": self.date_registered[:10] if self.date_registered else "",
-            "ns":  self.need_score.total if self.need_score else 0,
-            "nf":  self.need_score.factors if self.need_score else {},
-            "rm":  self.reserves_months,
-            "it":  self.income_trend,
-            "sr":  self.spending_ratio,
-            "an":  [a.to_dict() for a in self.anomalies],
-            "ar":  [ar.to_compact() for ar in self.annual_returns[:5]],
-        }
+        row = [
+            self.charity_number,
+            self.name,
+            self.postcode,
+            round(self.income),
+            round(self.spending),
+            round(self.reserves),
+            self.employees,
+            self.volunteers,
+            self.categories[:3],
+            self.beneficiaries[:2],
+            self.activities[:200],
+            self.date_registered[:10] if self.date_registered else "",
+            self.need_score.total if self.need_score else 0,
+            self.need_score.factors if self.need_score else {},
+            self.reserves_months,
+            self.income_trend,
+            self.spending_ratio,
+            [a.to_dict() for a in self.anomalies],
+            [ar.to_compact() for ar in self.annual_returns[:5]],
+        ]
 
         if self.geo and self.geo.lat is not None and self.geo.lng is not None:
-            d["lat"] = round(self.geo.lat, 5)
-            d["lng"] = round(self.geo.lng, 5)
-            d["dist"] = self.geo.district or ""
-            d["ward"] = self.geo.ward or ""
-
-        return d
+            row += [
+                round(self.geo.lat, 5),
+                round(self.geo.lng, 5),
+                self.geo.district or "",
+                self.geo.ward or "",
+            ]
+
+        return row
 
     def to_full(self) -> dict:
         """Full dictionary for API responses (not abbreviated)."""
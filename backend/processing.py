@@ -12,7 +12,9 @@ Features:
 - Keeps anomaly detection intact
 """
 
+import operator
 from datetime import datetime
+from functools import lru_cache
 from backend.config import SCORE_WEIGHTS, ANOMALY_RULES, DEFAULT_MIN_SPENDING
 from backend.models import Charity, NeedScore, Anomaly
 
@@ -42,28 +44,14 @@ def compute_need_scores(charities: dict[str, Charity]) -> None:
     for c in filtered.values():
         _compute_derived_metrics(c)
 
-    # Step 2: Collect factor values for percentile calculation
-    factor_values = {key: [] for key in SCORE_WEIGHTS.keys()}
-    for c in filtered.values():
-        for factor, cfg in SCORE_WEIGHTS.items():
-            value = _extract_factor_value(c, factor)
-            if value is not None:
-                factor_values[factor].append(value)
-
-    # Compute sorted values per factor
-    factor_percentiles = {f: sorted(vals) for f, vals in factor_values.items()}
-
-    # Step 3: Assign raw factor scores
+    # Steps 2–3: Extract each factor value once and score it directly
+    now = datetime.now()
     raw_totals = []
     for c in filtered.values():
         factors = {}
         for factor, cfg in SCORE_WEIGHTS.items():
-            value = _extract_factor_value(c, factor)
-            if value is not None and factor_percentiles[factor]:
-                score = _factor_percentile_score(value, factor, factor_percentiles[factor], cfg)
-            else:
-                score = 0
-            factors[factor] = score
+            value = _extract_factor_value(c, factor, now)
+            factors[factor] = _factor_percentile_score(value, cfg) if value is not None else 0
         c.need_score = NeedScore(total=sum(factors.values()), factors=factors)
         raw_totals.append(c.need_score.total)
 
@@ -95,9 +83,10 @@ def compute_need_scores(charities: dict[str, Charity]) -> None:
 # ──────────────────────────────────────────────────────────────
 
 def _compute_derived_metrics(c: Charity) -> None:
-    """Compute intermediate financial metrics for scoring and anomalies."""
-    c.annual_returns.sort(key=lambda ar: ar.fin_period_end, reverse=True)
-
+    """
+    Compute intermediate financial metrics for scoring and anomalies.
+    Expects ``c.annual_returns`` newest first, as produced by the loader.
+    """
     c.reserves_months = round((c.reserves / c.spending) * 12, 1) if c.spending > 0 and c.reserves >= 0 else None
 
     if len(c.annual_returns) >= 2:
@@ -114,7 +103,20 @@ def _compute_derived_metrics(c: Charity) -> None:
 # FACTOR EXTRACTION
 # ──────────────────────────────────────────────────────────────
 
-def _extract_factor_value(c: Charity, factor: str):
+@lru_cache(maxsize=None)
+def _parse_date(date_str: str):
+    """
+    Parse a YYYY-MM-DD date, or None if malformed. Period-end dates repeat
+    heavily (most charities file to 31 March), so each distinct string is
+    parsed only once.
+    """
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _extract_factor_value(c: Charity, factor: str, now: datetime):
     if factor == "low_reserves":
         return c.reserves_months
     elif factor == "income_declining":
@@ -125,12 +127,9 @@ def _extract_factor_value(c: Charity, factor: str):
         return c.income
     elif factor == "late_filing":
         if c.annual_returns:
-            try:
-                latest_str = c.annual_returns[0].fin_period_end[:10]
-                latest_date = datetime.strptime(latest_str, "%Y-%m-%d")
-                return (datetime.now() - latest_date).days
-            except (ValueError, TypeError):
-                return None
+            latest_date = _parse_date(c.annual_returns[0].fin_period_end[:10])
+            if latest_date is not None:
+                return (now - latest_date).days
         return None
     elif factor == "multi_year_decline":
         return _count_declining_years(c)
@@ -141,7 +140,7 @@ def _extract_factor_value(c: Charity, factor: str):
 # FACTOR SCORING USING PERCENTILES
 # ──────────────────────────────────────────────────────────────
 
-def _factor_percentile_score(value, factor, all_values, cfg):
+def _factor_percentile_score(value, cfg):
     low, high = cfg["range"]
     max_points = cfg["max"]
     direction = cfg["direction"]
@@ -175,24 +174,31 @@ def _count_declining_years(c: Charity) -> int:
 # ANOMALY DETECTION
 # ──────────────────────────────────────────────────────────────
 
+_OPERATORS = {"lt": operator.lt, "gt": operator.gt}
+
+# ANOMALY_RULES flattened once at import:
+# (type, field, ((compare, threshold, severity, template), ...))
+_COMPILED_ANOMALY_RULES = tuple(
+    (
+        anomaly_type,
+        rule["field"],
+        tuple(
+            (_OPERATORS[cond.get("operator", "lt")], cond["threshold"], cond["severity"], cond["template"])
+            for cond in rule["conditions"]
+        ),
+    )
+    for anomaly_type, rule in ANOMALY_RULES.items()
+)
+
+
 def _detect_anomalies(c: Charity) -> None:
     c.anomalies = []
-    for anomaly_type, rule in ANOMALY_RULES.items():
-        field_name = rule["field"]
+    for anomaly_type, field_name, conditions in _COMPILED_ANOMALY_RULES:
         value = getattr(c, field_name, None)
         if value is None:
             continue
-        for condition in rule["conditions"]:
-            threshold = condition["threshold"]
-            operator = condition.get("operator", "lt")
-            severity = condition["severity"]
-            template = condition["template"]
-            triggered = False
-            if operator == "lt" and value < threshold:
-                triggered = True
-            elif operator == "gt" and value > threshold:
-                triggered = True
-            if triggered:
+        for compare, threshold, severity, template in conditions:
+            if compare(value, threshold):
                 detail = template.format(
                     val=value,
                     pct=abs(value) * 100 if abs(value) < 100 else abs(value),
@@ -23,10 +23,38 @@ let currentCenter = null; // { lat, lng, area }
 // DATA LOADING
 // ═══════════════════════════════════════════════════════════════════════════
 
+function rowsToRecords(rows, schema) {
+  // Generated data stores each charity as a positional row; CHARITY_SCHEMA
+  // names the columns. Rebuild keyed objects (short rows have no geo fields).
+  if (!schema) return rows;
+  return rows.map(row => {
+    const c = {};
+    for (let i = 0; i < row.length; i++) c[schema[i]] = row[i];
+    return c;
+  });
+}
+
+function expandLookups(data, lookup) {
+  // Generated data stores repeated labels (categories, districts, ...) once
+  // in CHARITY_LOOKUP; records hold indices. Restore plain strings in place.
+  if (!lookup) return data;
+  for (const [key, table] of Object.entries(lookup)) {
+    for (const c of data) {
+      const v = c[key];
+      if (Array.isArray(v)) c[key] = v.map(i => table[i]);
+      else if (v != null) c[key] = table[v];
+    }
+  }
+  return data;
+}
+
 function loadData() {
   // Option 1: Generated full dataset (loaded via <script> as global CHARITY_DATA)
   if (typeof window.CHARITY_DATA !== 'undefined' && window.CHARITY_DATA.length > 0) {
-    allData = window.CHARITY_DATA;
+    allData = expandLookups(
+      rowsToRecords(window.CHARITY_DATA, window.CHARITY_SCHEMA),
+      window.CHARITY_LOOKUP,
+    );
     console.log(`✓ Loaded ${allData.length} charities from generated data file`);
     return 'file';
   }
@@ -10,71 +10,221 @@ Usage:
     python prepare_data.py --region london    # Filter to London only
     python prepare_data.py --limit 500        # Cap output charities
     python prepare_data.py --no-geocode       # Skip geocoding step
+    python prepare_data.py --force-reprocess  # Ignore the processed-data cache
+    python prepare_data.py --workers 1        # Load supplementary data serially
+    python prepare_data.py --quiet            # Only report warnings and errors
 """
 
 import os
 import sys
+import glob
+import gzip
 import json
+import pickle
+import logging
+import hashlib
 import argparse
 from datetime import datetime
 
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Ensure project root is on the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from backend.config import OUTPUT_JS, OUTPUT_JSON, OUTPUT_DIR
+from backend.config import (
+    OUTPUT_JS, OUTPUT_JSON, OUTPUT_DIR, DATA_DIR, DATASETS, PROCESSED_CACHE_PATH, LOAD_WORKERS,
+    PROJECT_ROOT,
+    SCORE_WEIGHTS, ANOMALY_RULES, DEFAULT_MIN_SPENDING,
+)
+from backend.models import COMPACT_FIELDS
 from backend.data_sources import (
     download_all,
     load_charities,
-    load_classifications,
-    load_annual_returns,
-    load_parta_returns,
-    load_areas_of_operation,
+    load_supplementary,
 )
 from backend.processing import compute_need_scores, filter_viable_charities
 from backend.geocoding import geocode_charities
 
+logger = logging.getLogger("pipeline")
+
+
+# Compact keys whose values repeat across many charities. Their labels are
+# written once to a lookup table and each record stores indices instead.
+INTERNED_KEYS = ("cat", "ben", "dist")
+
+
+def _intern_labels(compact: list) -> dict:
+    """
+    Replace repeated labels in compact rows with table indices (mutates).
+
+    Returns {key: [label, ...]}; a record's ``cat: [3, 7]`` means
+    ``[lookup["cat"][3], lookup["cat"][7]]``.
+    """
+    lookup = {}
+    for key in INTERNED_KEYS:
+        pos = COMPACT_FIELDS.index(key)
+        ids: dict = {}
+        for row in compact:
+            if pos >= len(row):
+                continue
+            v = row[pos]
+            if isinstance(v, list):
+                row[pos] = [ids.setdefault(label, len(ids)) for label in v]
+            else:
+                row[pos] = ids.setdefault(v, len(ids))
+        lookup[key] = list(ids)
+    return lookup
+
+
+# Modules whose code shapes the cached Charity objects; editing any of
+# them invalidates the processed-data cache.
+PIPELINE_SOURCES = ("config.py", "data_sources.py", "models.py", "processing.py")
+
+
+def _processed_cache_path(region) -> str:
+    """
+    Cache file for the scored charities of this run's exact inputs.
+
+    Keyed on each source file's size and mtime, the region, the scoring
+    config, the pipeline code, and today's date (the late-filing factor
+    counts days to now).
+    """
+    sources = []
+    for name in sorted(DATASETS):
+        path = os.path.join(DATA_DIR, f"{name}.txt")
+        try:
+            st = os.stat(path)
+            sources.append((name, st.st_size, st.st_mtime_ns))
+        except OSError:
+            sources.append((name, None, None))
+
+    code = hashlib.md5()
+    for name in PIPELINE_SOURCES:
+        with open(os.path.join(PROJECT_ROOT, "backend", name), "rb") as f:
+            code.update(f.read())
+
+    key = repr((
+        sources, region, datetime.now().date().isoformat(), code.hexdigest(),
+        SCORE_WEIGHTS, ANOMALY_RULES, DEFAULT_MIN_SPENDING,
+    ))
+    sig = hashlib.md5(key.encode("utf-8")).hexdigest()
+    return PROCESSED_CACHE_PATH.format(region=region or "all", sig=sig)
+
+
+def _load_processed(path):
+    """Return the cached viable-charity list, or None if absent/unreadable."""
+    try:
+        with gzip.open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # Any unreadable cache (corrupt gzip, old pickle, ...) is just a miss
+        logger.warning("  ✗ Ignoring unreadable processed-data cache %s: %s", path, e)
+        return None
+
+
+def _store_processed(path, region, viable):
+    """
+    Cache the viable-charity list, replacing older cache files for the
+    same region. Each region keeps its own file, so alternating runs
+    with and without --region both stay cached. Failures are logged
+    and otherwise ignored.
+    """
+    tmp = path + ".tmp"
+    try:
+        for old in glob.glob(PROCESSED_CACHE_PATH.format(region=region or "all", sig="*")):
+            if old != path:
+                os.remove(old)
+        with gzip.open(tmp, "wb", compresslevel=1) as f:
+            pickle.dump(viable, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:
+        # The cache is only an optimisation; carry on without it
+        logger.warning("  ✗ Could not write processed-data cache: %s", e)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def _dumps(obj) -> bytes:
+    """Compact UTF-8 JSON — via orjson when installed, else stdlib json."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
 
 def write_output(charities, output_js, output_json):
     """Write processed data as JS + JSON files for the frontend."""
     os.makedirs(os.path.dirname(output_js), exist_ok=True)
 
-    # Use your method to convert Charity objects to compact dicts
+    # Positional rows; CHARITY_SCHEMA / "schema" names the columns
     compact = [c.to_compact() for c in charities]
+    lookup = _intern_labels(compact)
     now = datetime.now()
 
+    # Serialise the payload once; both files embed the same bytes
+    schema_json = _dumps(list(COMPACT_FIELDS))
+    lookup_json = _dumps(lookup)
+    data_json = _dumps(compact)
+    del compact
+    meta = {
+        "source": "Charity Commission for England & Wales",
+        "licence": "Open Government Licence v3.0",
+        "generated": now.isoformat(),
+        "count": len(charities),
+    }
+
     # JavaScript version (embeddable)
-    js_content = (
+    js_header = (
         f"// Charity Intelligence Map — Processed Data\n"
         f"// Source: Charity Commission for England & Wales (OGL v3.0)\n"
         f"// Generated: {now.strftime('%Y-%m-%d %H:%M')}\n"
-        f"// Charities: {len(compact)}\n\n"
-        f"var CHARITY_DATA = {json.dumps(compact, separators=(',', ':'))};\n"
-        f"var DATA_META = {json.dumps({'source': 'Charity Commission for England & Wales', 'licence': 'Open Government Licence v3.0', 'generated': now.isoformat(), 'count': len(compact), 'isRealData': True}, separators=(',', ':'))};\n"
+        f"// Charities: {len(charities)}\n\n"
+    ).encode("utf-8")
+    js_parts = (
+        js_header,
+        b"var CHARITY_SCHEMA = ", schema_json, b";\n",
+        b"var CHARITY_LOOKUP = ", lookup_json, b";\n",
+        b"var CHARITY_DATA = ", data_json, b";\n",
+        b"var DATA_META = ", _dumps({**meta, "isRealData": True}), b";\n",
     )
 
-    with open(output_js, "w", encoding="utf-8") as f:
-        f.write(js_content)
-
     # JSON version (for API)
-    with open(output_json, "w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "meta": {
-                    "source": "Charity Commission for England & Wales",
-                    "licence": "Open Government Licence v3.0",
-                    "generated": now.isoformat(),
-                    "count": len(compact),
-                },
-                "charities": compact,
-            },
-            f,
-            separators=(",", ":"),
-        )
+    json_parts = (
+        b'{"meta":', _dumps(meta),
+        b',"schema":', schema_json,
+        b',"lookup":', lookup_json,
+        b',"charities":', data_json,
+        b"}",
+    )
+
+    # Each file, plus a pre-compressed copy for hosts that serve it with
+    # Content-Encoding: gzip, is written piece by piece — the payload is
+    # never copied into one concatenated buffer.
+    output_js_gz = output_js + ".gz"
+    output_json_gz = output_json + ".gz"
+    for path, gz_path, parts in (
+        (output_js, output_js_gz, js_parts),
+        (output_json, output_json_gz, json_parts),
+    ):
+        with open(path, "wb") as f:
+            f.writelines(parts)
+        with gzip.open(gz_path, "wb", compresslevel=6) as f:
+            f.writelines(parts)
 
     js_mb = os.path.getsize(output_js) / 1e6
     json_mb = os.path.getsize(output_json) / 1e6
-    print(f"\n  ✓ JS output:   {output_js} ({js_mb:.1f} MB)")
-    print(f"  ✓ JSON output: {output_json} ({json_mb:.1f} MB)")
+    js_gz_mb = os.path.getsize(output_js_gz) / 1e6
+    json_gz_mb = os.path.getsize(output_json_gz) / 1e6
+    logger.info("\n  ✓ JS output:   %s (%.1f MB, %.1f MB gzipped)", output_js, js_mb, js_gz_mb)
+    logger.info("  ✓ JSON output: %s (%.1f MB, %.1f MB gzipped)", output_json, json_mb, json_gz_mb)
 
 
 def main():
@@ -97,67 +247,99 @@ def main():
         "--no-geocode", action="store_true",
         help="Skip the geocoding step",
     )
+    parser.add_argument(
+        "--force-reprocess", action="store_true",
+        help="Rebuild scores even if cached results match the inputs",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=LOAD_WORKERS,
+        help="Processes used to load the supplementary datasets (1 = serial)",
+    )
+    parser.add_argument(
+        "--quiet", action="store_true",
+        help="Only report warnings and errors",
+    )
     args = parser.parse_args()
 
-    print("╔══════════════════════════════════════════════════╗")
-    print("║  Charity Intelligence Map — Data Pipeline        ║")
-    print("║  Real data from Charity Commission (E&W)         ║")
-    print("╚══════════════════════════════════════════════════╝")
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format="%(message)s",
+        stream=sys.stdout,
+    )
+
+    if not args.quiet:
+        print(
+            "╔══════════════════════════════════════════════════╗\n"
+            "║  Charity Intelligence Map — Data Pipeline        ║\n"
+            "║  Real data from Charity Commission (E&W)         ║\n"
+            "╚══════════════════════════════════════════════════╝"
+        )
 
     # ── Step 1: Download ──
     if not args.skip_download:
-        print("\n── Step 1: Downloading datasets ──")
+        logger.info("\n── Step 1: Downloading datasets ──")
         download_all()
     else:
-        print("\n── Step 1: Skipped (using cached data) ──")
+        logger.info("\n── Step 1: Skipped (using cached data) ──")
+
+    cache_path = _processed_cache_path(args.region)
+    viable = None if args.force_reprocess else _load_processed(cache_path)
 
-    # ── Step 2: Load raw data ──
-    print("\n── Step 2: Loading charity register ──")
-    charities = load_charities(region=args.region)
+    if viable is not None:
+        logger.info("\n── Steps 2–4: Skipped (inputs unchanged, using cached scores) ──")
+        logger.info("  Viable charities with financials: %s", len(viable))
+    else:
+        # ── Step 2: Load raw data ──
+        logger.info("\n── Step 2: Loading charity register ──")
+        charities = load_charities(region=args.region)
 
-    if not charities:
-        print("\n✗ No charities loaded. Check that data files exist in data_cache/")
-        sys.exit(1)
+        if not charities:
+            logger.error("\n✗ No charities loaded. Check that data files exist in data_cache/")
+            sys.exit(1)
 
-    print("\n── Step 3: Loading supplementary data ──")
-    load_classifications(charities)
-    load_annual_returns(charities)
-    load_parta_returns(charities)
-    load_areas_of_operation(charities)
+        logger.info("\n── Step 3: Loading supplementary data ──")
+        load_supplementary(charities, workers=args.workers)
 
-    # ── Step 4: Process ──
-    print("\n── Step 4: Computing need scores & anomalies ──")
-    compute_need_scores(charities)
-    viable = filter_viable_charities(charities)
-    print(f"  Viable charities with financials: {len(viable)}")
+        # ── Step 4: Process ──
+        logger.info("\n── Step 4: Computing need scores & anomalies ──")
+        compute_need_scores(charities)
+        viable = filter_viable_charities(charities)
+        logger.info("  Viable charities with financials: %s", len(viable))
+        _store_processed(cache_path, args.region, viable)
 
     if args.limit:
         viable = viable[: args.limit]
-        print(f"  Limited to top {args.limit}")
+        logger.info("  Limited to top %s", args.limit)
 
     # ── Step 5: Geocode ──
     if not args.no_geocode:
-        print("\n── Step 5: Geocoding postcodes ──")
+        logger.info("\n── Step 5: Geocoding postcodes ──")
         viable = geocode_charities(viable)
     else:
-        print("\n── Step 5: Skipped geocoding ──")
+        logger.info("\n── Step 5: Skipped geocoding ──")
 
     # ── Step 6: Output ──
-    print("\n── Step 6: Writing output ──")
+    logger.info("\n── Step 6: Writing output ──")
     write_output(viable, OUTPUT_JS, OUTPUT_JSON)
 
     # ── Summary ──
-    scores = [c.need_score.total for c in viable if c.need_score]
-    high_need = sum(1 for s in scores if s >= 50)
-    with_anomalies = sum(1 for c in viable if c.anomalies)
-
-    print(f"\n── Summary ──")
-    print(f"  Total charities:    {len(viable)}")
-    print(f"  High need (≥50):    {high_need}")
-    print(f"  With anomalies:     {with_anomalies}")
-    if scores:
-        print(f"  Avg need score:     {sum(scores)/len(scores):.1f}")
-    print(f"\n✓ Done! Run the app with: python run.py")
+    score_sum = n_scored = high_need = with_anomalies = 0
+    for c in viable:
+        if c.need_score:
+            score_sum += c.need_score.total
+            n_scored += 1
+            if c.need_score.total >= 50:
+                high_need += 1
+        if c.anomalies:
+            with_anomalies += 1
+
+    logger.info("\n── Summary ──")
+    logger.info("  Total charities:    %s", len(viable))
+    logger.info("  High need (≥50):    %s", high_need)
+    logger.info("  With anomalies:     %s", with_anomalies)
+    if n_scored:
+        logger.info("  Avg need score:     %.1f", score_sum/n_scored)
+    logger.info("\n✓ Done! Run the app with: python run.py")
 
 
 if __name__ == "__main__":